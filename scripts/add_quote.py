@@ -6,7 +6,12 @@ from pathlib import Path
 from quotes import Folder
 
 if __name__ == "__main__":
-    path = Path(__file__).parent.parent / (sys.argv[1:] or [input("Folder: ")])[0]
+    args = sys.argv[1:]
+    verify = "--verify" in args
+    if verify:
+        args.remove("--verify")
+
+    path = Path(__file__).parent.parent / (args or [input("Folder: ")])[0]
     if not path.exists():
         print(f"The folder {path} doesn't exist, please create it beforehand")
         sys.exit(1)
@@ -22,3 +27,8 @@ if __name__ == "__main__":
         item.pop()
 
     folder.add(item)
+
+    # Check and fix the whole folder only if asked, as adding a quote doesn't change the other files
+    if verify:
+        folder.check()
+        folder.fix()
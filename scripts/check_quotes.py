@@ -1,17 +1,47 @@
 """Check that the quotes are correctly formatted."""
 
+import os
 import sys
 import warnings
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from quotes import Folder
+from quotes import Folder, find_index_files
+
+# Number of files below which starting worker processes costs more than checking the folders one by one
+PARALLEL_MIN_FILES = 100
+
+
+def check_folder(index_file: str) -> tuple[Path, list[tuple[str, type[Warning]]]]:
+    """Check the folder of the given resolved `0.json` file and return its path and the raised warnings."""
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter("always")
+        folder = Folder(Path(index_file).parent, resolved=True)
+        folder.check()
+
+    return folder.path, [(str(warning.message), warning.category) for warning in w]
+
 
 if __name__ == "__main__":
+    # The folders found below a resolved path are already resolved
+    index_files = list(find_index_files(Path(__file__).parent.parent.resolve()))
+
     with warnings.catch_warnings(record=True) as w:
-        for path in Path(__file__).parent.parent.glob("**/0.json"):
-            folder = Folder(path.parent)
-            print(f"Checking {folder.path}...")
-            folder.check()
+        # The folders are independent, so check them in parallel,
+        # but only if there are enough files and several CPUs to pay for starting the workers
+        files_count = sum(len(list(Path(index_file).parent.iterdir())) for index_file in index_files)
+        results: Iterable[tuple[Path, list[tuple[str, type[Warning]]]]]
+        if len(index_files) > 1 and files_count >= PARALLEL_MIN_FILES and (os.cpu_count() or 1) > 1:
+            with ProcessPoolExecutor() as executor:
+                results = list(executor.map(check_folder, index_files))
+        else:
+            results = map(check_folder, index_files)
+
+        for path, folder_warnings in results:
+            print(f"Checking {path}...")
+            for message, category in folder_warnings:
+                warnings.warn(message, category, stacklevel=1)
 
         if w:
             sys.exit(1)
@@ -1,6 +1,7 @@
 """Fetch quotes from a Google Sheets document and add them in their corresponding folder."""
 
 import csv
+import io
 import os
 import urllib.request
 import warnings
@@ -9,34 +10,37 @@ from pathlib import Path
 from quotes import Folder
 
 BASE = Path(__file__).parent.parent.resolve()
+BASE_PREFIX = str(BASE) + os.sep
 URL = os.environ.get("GOOGLE_SHEETS_URL") or (BASE / ".google_sheets_url").read_text("utf-8").strip()
 
 
 if __name__ == "__main__":
     print("Downloading file... ", end="")
+    buckets: dict[Path, list[list[str]]] = {}
 
+    # Parse the CSV file while it is downloaded instead of buffering it
     with urllib.request.urlopen(URL) as response:
-        data = response.read()
+        reader = csv.DictReader(io.TextIOWrapper(response, encoding="utf-8", newline=""))
+
+        for row in reader:
+            folder_path = (BASE / row["Catégorie"]).resolve()
+            if folder_path != BASE and not str(folder_path).startswith(BASE_PREFIX):
+                warnings.warn(f"The path {row['Catégorie']} is suspicious, ignoring it", stacklevel=2)
+                continue
+
+            buckets.setdefault(folder_path, []).append([
+                row["Citation"],
+                row["Auteur (la personne qui a dit la citation)"],
+                row["Source (œuvre, chanson, ...)"],
+            ])
     print("OK")
 
-    reader = csv.DictReader(data.decode("utf-8").splitlines())
-
     print("Adding quotes... ", end="")
     quotes_count = 0
-    for row in reader:
-        folder_path = (BASE / row["Catégorie"]).resolve()
-        if not folder_path.is_relative_to(BASE):
-            warnings.warn(f"The path {row['Catégorie']} is suspicious, ignoring it", stacklevel=2)
-            continue
-
-        folder = Folder(folder_path)
-        folder.add([
-            row["Citation"],
-            row["Auteur (la personne qui a dit la citation)"],
-            row["Source (œuvre, chanson, ...)"],
-        ])
-
-        quotes_count += 1
+    # Add the quotes of each folder at once, so that each folder is fixed only once
+    for folder_path, quotes in buckets.items():
+        Folder(folder_path, resolved=True).add_batch(quotes)
+        quotes_count += len(quotes)
 
     print(f"{quotes_count} quotes added")
     print("Now please delete all the records in the Google Sheets document.")
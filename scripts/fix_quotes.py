@@ -2,11 +2,12 @@
 
 from pathlib import Path
 
-from quotes import Folder
+from quotes import Folder, find_index_files
 
 if __name__ == "__main__":
-    for path in Path(__file__).parent.parent.glob("**/0.json"):
-        folder = Folder(path.parent)
+    # The folders found below a resolved path are already resolved
+    for path in find_index_files(Path(__file__).parent.parent.resolve()):
+        folder = Folder(Path(path).parent, resolved=True)
         print(f"Fixing {folder.path}...")
         folder.check()
         folder.fix()
@@ -1,30 +1,81 @@
 """A module to manage quotes."""
 
+import importlib
 import json
+import math
+import os
+import re
 import warnings
-from collections.abc import Generator
+from collections.abc import Callable, Generator, Iterable
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, TypeVar, cast, overload
+from typing import Any, TypeVar, cast, get_origin, overload
+
+# orjson is optional, import it dynamically so that its absence doesn't leave unknown types
+try:
+    json_fast = importlib.import_module("orjson")
+except ImportError:
+    json_fast = None
+
+# Choose the JSON functions once, the orjson and stdlib pairs read and produce the same compact UTF-8 JSON
+_json_loads: Callable[[bytes], Any]
+_json_dumps: Callable[[Any], bytes]
+if json_fast is not None:
+    _json_loads = json_fast.loads
+    _json_dumps = json_fast.dumps
+else:
+    _json_loads = json.loads
+
+    def _stdlib_json_dumps(obj: object, /) -> bytes:
+        """Serialize `obj` to compact UTF-8 JSON bytes."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    _json_dumps = _stdlib_json_dumps
+
 
 MAX_QUOTES_PER_FILE = 100
 
+# Single characters replaced by `Folder.fix_item`
+_TRANS = str.maketrans({"\xa0": " ", "\u2019": "'"})
+# Matches everything that `Folder.fix_item` would replace
+_TRANS_RE = re.compile(r"[\xa0\u2019]|\xab | \xbb")
+
 T = TypeVar("T")
 
 
+def find_index_files(root: str | os.PathLike[str]) -> Generator[str, None, None]:
+    """Yield the paths of all the `0.json` files below `root`."""
+    stack = [os.fspath(root)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name == "0.json":
+                    yield entry.path
+
+
 class Folder:
     """A folder containing quotes."""
 
-    def __init__(self, path: Path) -> None:
-        """Create a new `Folder`."""
-        self.path = path.resolve()
-
-    @property
-    def new_path(self) -> Path:
-        """The path to the temporary `new` folder when fixing quote files."""
-        return (self.path / "new").resolve()
+    def __init__(self, path: Path, *, resolved: bool = False) -> None:
+        """
+        Create a new `Folder`.
 
-    def get_number(self, file: Path, zero_ok: bool = False) -> int:
+        If `resolved` is `True`, the given path must already be absolute and free of symlinks.
+        """
+        self.path = path if resolved else path.resolve()
+        # The path to the temporary `new` folder when fixing quote files
+        self.new_path = self.path / "new"
+        self._files_cache: list[Path] | None = None
+        self._data_cache: dict[Path, Any] = {}
+
+    def _invalidate(self) -> None:
+        """Forget the cached files list and file contents."""
+        self._files_cache = None
+        self._data_cache.clear()
+
+    def get_number(self, file: Path) -> int:
         """
         Return the number included in the name of the given file.
 
@@ -42,50 +93,32 @@ class Folder:
             raise ValueError(msg)
 
         number = int(rel.name[:-5])
-        if zero_ok and number == 0:
-            return number
         if number <= 0:
             msg = f"Number {number} in file {file} is negative or null"
             raise ValueError(msg)
         return number
 
-    def get_number_safe(self, file: Path) -> int:
-        """Return the number included in the name of the given file or -1 if there were any errors."""
-        try:
-            return self.get_number(file)
-        except ValueError:
-            return -1
-
-    def is_valid_file_name(self, file: Path) -> bool:
-        """Check if the given file name is valid."""
-        try:
-            self.get_number(file)
-        except ValueError:
-            return False
-        else:
-            return True
-
     @overload
-    @staticmethod
     @contextmanager
     def open_file(
+        self,
         file: Path,
         datatype: type[T],
         save: bool = False,
     ) -> Generator[T, None, None]: ...
 
     @overload
-    @staticmethod
     @contextmanager
     def open_file(
+        self,
         file: Path,
         datatype: None = None,
         save: bool = False,
     ) -> Generator[dict[str, Any] | list[list[str]], None, None]: ...
 
-    @staticmethod
     @contextmanager
     def open_file(
+        self,
         file: Path,
         datatype: type[T] | None = None,
         save: bool = False,
@@ -93,73 +126,89 @@ class Folder:
         """
         Open the given JSON file and optionally `save` it.
 
+        The parsed contents of the files opened without `save` are cached until the file is saved.
+
         Raises:
             TypeError: if the data has a wrong type (not dict/list).
 
         """
-        try:
-            data = json.loads(file.read_text("utf-8"))
-        except FileNotFoundError:
-            data = {}
+        if not save and file in self._data_cache:
+            data = self._data_cache[file]
+        else:
+            try:
+                # Both parsers decode the UTF-8 bytes themselves
+                data = _json_loads(file.read_bytes())
+            except FileNotFoundError:
+                data = {}
+            if not save:
+                self._data_cache[file] = data
         if not isinstance(data, dict | list):
             msg = f"Wrong type for data in {file}"
             raise TypeError(msg)
         data = cast("dict[str, Any] | list[list[str]]", data)
-        if datatype is dict and isinstance(data, list):
+        origin = get_origin(datatype) or datatype
+        if origin is dict and isinstance(data, list):
             data = {"items": data}
-        if datatype is list and isinstance(data, dict):
+        if origin is list and isinstance(data, dict):
             data = data.get("items", [])
         yield data  # type: ignore[reportReturnType]
         if save:
-            with file.open("w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            self.save_file(file, data)
+
+    def save_file(self, file: Path, data: dict[str, Any] | list[list[str]]) -> None:
+        """Save the given data in a JSON file."""
+        file.write_bytes(_json_dumps(data))
+        # The file may have been created, so the files list must also be refreshed
+        self._data_cache.pop(file, None)
+        self._files_cache = None
 
     def get_files(self) -> list[Path]:
-        """Return the list of the files included in this folder."""
-        files: list[Path] = []
+        """
+        Return the list of the files included in this folder.
+
+        Raises:
+            ValueError: if a file has the wrong extension or a wrong number.
 
-        for item in sorted(self.path.iterdir(), key=self.get_number_safe):
-            if item.is_file():
-                item = item.resolve()  # noqa: PLW2901
+        """
+        if self._files_cache is not None:
+            return list(self._files_cache)
+
+        files: list[tuple[int, str]] = []
 
-                if item.is_relative_to(self.new_path):
-                    item.unlink()
+        # Use the file types returned by scandir (only symlinks need a stat) and parse each number only once
+        with os.scandir(self.path) as it:
+            for entry in it:
+                if not entry.is_file():
                     continue
 
-                if not self.is_valid_file_name(item):
-                    if self.get_number(item, zero_ok=True) == 0:
-                        continue
-                    warnings.warn(f"Invalid file name: {item}", stacklevel=2)
-                files.append(item)
+                if not entry.name.endswith(".json"):
+                    msg = f"File {entry.path} doesn't end with .json"
+                    raise ValueError(msg)
 
-        return files
+                number = int(entry.name[:-5])
+                if number == 0:
+                    continue
+                if number < 0:
+                    msg = f"Number {number} in file {entry.path} is negative"
+                    raise ValueError(msg)
+                files.append((number, entry.path))
+
+        files.sort()
+        self._files_cache = [Path(path) for _, path in files]
+        return list(self._files_cache)
 
     @staticmethod
     def get_items(data: dict[str, Any] | list[list[str]]) -> list[list[str]]:
         """Return the quotes list in a JSON file."""
         return data.get("items", data) if isinstance(data, dict) else data
 
-    def get_total(self, files: list[Path] | None = None) -> int:
-        """Return the total number of quotes in the given files."""
-        files = files or self.get_files()
-        total = 0
-
-        index_file = self.path / "0.json"
-
-        with self.open_file(index_file, datatype=dict[str, Any]) as data:
-            if data.get("items") is not None:
-                files = [index_file, *files]
-
-        for file in files:
-            with self.open_file(file, datatype=list[list[str]]) as data:
-                total += len(self.get_items(data))
-
-        return total
-
     @staticmethod
     def fix_item(item: str) -> str:
         """Fix a quote item (quote, author, ...) by removing non-ASCII characters."""
-        return item.replace("\xa0", " ").replace("\u2019", "'").replace("\xab ", '"').replace(" \xbb", '"')
+        # All the replaced characters are non-ASCII
+        if item.isascii():
+            return item
+        return item.translate(_TRANS).replace("\xab ", '"').replace(" \xbb", '"')
 
     def fix_quotes(self, quotes: list[list[str]]) -> list[list[str]]:
         """Fix the quotes by removing non-ASCII characters."""
@@ -172,7 +221,6 @@ class Folder:
             return
 
         files = self.get_files()
-        total = self.get_total(files)
 
         index_file = self.path / "0.json"
         with self.open_file(index_file) as old_data:
@@ -182,105 +230,121 @@ class Folder:
             else:
                 data = old_data
 
-            if data.get("total", 0) != total:
-                warnings.warn(f"Total of {data['total']} doesn't match the length of {total}", stacklevel=2)
-
             if data.get("items") is not None:
                 warnings.warn(f"Items section in file {index_file}", stacklevel=2)
 
+        # Count the quotes while checking the files, so that each file is parsed only once
+        total = len(self.get_items(data)) if data.get("items") is not None else 0
         for i, file in enumerate(files, start=-len(files)):
-            self.check_file(file, last=i == -1)
+            with self.open_file(file) as file_data:
+                total += len(self.get_items(file_data))
+                self._check_file_data(file, file_data, last=i == -1)
+
+        if data.get("total", 0) != total:
+            warnings.warn(f"Total of {data.get('total', 0)} doesn't match the length of {total}", stacklevel=2)
 
     def check_file(self, file: Path, last: bool = False) -> None:
         """Check the structure and the total and end attributes in a quotes file."""
-        with self.open_file(file) as old_data:
-            if isinstance(old_data, dict):
-                warnings.warn(f"Dict structure in file {file}", stacklevel=2)
-                if "items" not in old_data:
-                    warnings.warn(f"No items section in file {file}", stacklevel=2)
-                data: list[list[str]] = old_data.get("items", [])
-            else:
-                data = old_data
-
-            number_of_items = len(self.get_items(data))
-            if number_of_items > MAX_QUOTES_PER_FILE or (not last and number_of_items < MAX_QUOTES_PER_FILE):
-                warnings.warn(
-                    f"Total of {number_of_items} doesn't match the maximum quotes number of {MAX_QUOTES_PER_FILE}",
-                    stacklevel=2,
-                )
+        with self.open_file(file) as data:
+            self._check_file_data(file, data, last=last)
 
-            for quote in self.get_items(data):
-                for item in quote:
-                    if self.fix_item(item) != item:
-                        warnings.warn(f"Item '{item}' contains non-ASCII characters", stacklevel=2)
+    @staticmethod
+    def _check_file_data(file: Path, old_data: dict[str, Any] | list[list[str]], last: bool = False) -> None:
+        """Check the already parsed contents of the given quotes file."""
+        if isinstance(old_data, dict):
+            warnings.warn(f"Dict structure in file {file}", stacklevel=2)
+            if "items" not in old_data:
+                warnings.warn(f"No items section in file {file}", stacklevel=2)
+            data: list[list[str]] = old_data.get("items", [])
+        else:
+            data = old_data
+
+        number_of_items = len(data)
+        if number_of_items > MAX_QUOTES_PER_FILE or (not last and number_of_items < MAX_QUOTES_PER_FILE):
+            warnings.warn(
+                f"Total of {number_of_items} doesn't match the maximum quotes number of {MAX_QUOTES_PER_FILE}",
+                stacklevel=2,
+            )
+
+        # Avoid the attribute lookups in the loop over all the items
+        isascii = str.isascii
+        search = _TRANS_RE.search
+        for quote in data:
+            for item in quote:
+                if not isascii(item) and search(item):
+                    warnings.warn(f"Item '{item}' contains non-ASCII characters", stacklevel=2)
 
     def fix(self) -> None:
         """Fix the current quotes folder."""
-        self.new_path.mkdir(parents=True, exist_ok=True)
-
         files = self.get_files()
-        total = self.get_total(files)
 
         index_file = self.path / "0.json"
-        with self.open_file(index_file, datatype=dict[str, Any], save=True) as data:
-            if data.get("items") is not None:
+        with self.open_file(index_file, datatype=dict[str, Any]) as index_data:
+            if index_data.get("items") is not None:
                 files.insert(0, index_file)
 
-        # Check the quotes number, split between files
-        filename_index = 1
+        # Gather all the quotes, keeping the old contents of the files to compare them afterwards
+        old_contents: list[dict[str, Any] | list[list[str]]] = []
         stack: list[list[str]] = []
+        for file in files:
+            with self.open_file(file) as data:
+                old_contents.append(data)
+                stack.extend(data if isinstance(data, list) else data.get("items", []))
+        total = len(stack)
+
+        # Check the quotes number, split between files and fix each chunk only when it is written,
+        # so that only one fixed chunk exists at a time
+        chunks_count = math.ceil(total / MAX_QUOTES_PER_FILE)
+        chunks = (self.fix_quotes(stack[i : i + MAX_QUOTES_PER_FILE]) for i in range(0, total, MAX_QUOTES_PER_FILE))
+        new_index_data = {"total": total, "chunk_size": MAX_QUOTES_PER_FILE}
+
+        # If the files stay the same, only rewrite the ones that changed
+        if [file.name for file in files] == [f"{i}.json" for i in range(1, chunks_count + 1)]:
+            for file, old_data, chunk in zip(files, old_contents, chunks, strict=True):
+                if old_data != chunk:
+                    self.save_file(file, chunk)
+            if index_data != new_index_data:
+                self.save_file(index_file, new_index_data)
+        else:
+            self._replace_files(files, chunks, new_index_data)
 
-        def fill_file(end: bool = False) -> bool:
-            """
-            Add `MAX_QUOTES_NUMBER` quotes in `new/x.json` where `x` is a counter.
-
-            If `end` is `True`, add all the remaining quotes.
-            """
-            nonlocal filename_index, stack
-            if stack and (end or len(stack) > MAX_QUOTES_PER_FILE):
-                with self.open_file(
-                    self.new_path / f"{filename_index}.json",
-                    datatype=list[list[str]],
-                    save=True,
-                ) as data:
-                    data[:], stack = stack[:MAX_QUOTES_PER_FILE], stack[MAX_QUOTES_PER_FILE:]
-                    filename_index += 1
-                return True
-            return False
+    def _replace_files(self, files: list[Path], chunks: Iterable[list[list[str]]], index_data: dict[str, Any]) -> None:
+        """Replace the given files with the `0.json` file and the given chunks, through the `new` folder."""
+        self.new_path.mkdir(parents=True, exist_ok=True)
+
+        # Create the 0.json file with the total attribute, then add the quotes into the corresponding files
+        self.save_file(self.new_path / "0.json", index_data)
+        for i, chunk in enumerate(chunks, start=1):
+            self.save_file(self.new_path / f"{i}.json", chunk)
 
+        # Remove the old files and add the new files instead
         for file in files:
-            with self.open_file(file, datatype=list[list[str]]) as data:
-                stack.extend(self.get_items(data))
-                fill_file()
-                # Remove the old file
-                file.unlink()
-
-        # Create the 0.json file with the total attribute
-        with self.open_file(self.new_path / "0.json", datatype=dict[str, Any], save=True) as data:
-            data["total"] = total
-            data["chunk_size"] = MAX_QUOTES_PER_FILE
-
-        # Add the quotes into the corresponding files
-        while fill_file():
-            pass
-        fill_file(end=True)
-
-        # Add the new files instead of the old ones
+            file.unlink()
         for file in self.new_path.iterdir():
             file.rename(file.parent.parent / file.name)
         self.new_path.rmdir()
+        self._invalidate()
 
     def add(self, quote: list[str]) -> None:
         """Add a quote to the folder."""
+        self.add_batch([quote])
+
+    def add_batch(self, quotes: list[list[str]]) -> None:
+        """Add several quotes to the folder at once, without fixing the other files."""
+        # Only the new quotes need to be fixed, the other files are left as they are
+        quotes = self.fix_quotes(quotes)
         file = self.get_files()[-1]
+        number = self.get_number(file)
 
-        with self.open_file(file, datatype=list[list[str]], save=True) as data:
-            if len(data) >= MAX_QUOTES_PER_FILE:
-                file = self.path / f"{self.get_number(file) + 1}.json"
+        # Fill the last file, then put the remaining quotes in new files
+        with self.open_file(file, datatype=list[list[str]]) as data:
+            free_space = max(MAX_QUOTES_PER_FILE - len(data), 0)
+            if free_space and quotes:
+                self.save_file(file, [*data, *quotes[:free_space]])
 
-        with self.open_file(file, datatype=list[list[str]], save=True) as data:
-            data.append(quote)
+        for i in range(free_space, len(quotes), MAX_QUOTES_PER_FILE):
+            number += 1
+            self.save_file(self.path / f"{number}.json", quotes[i : i + MAX_QUOTES_PER_FILE])
 
-        with warnings.catch_warnings(action="ignore"):
-            self.check()
-            self.fix()
+        with self.open_file(self.path / "0.json", datatype=dict[str, Any], save=True) as data:
+            data["total"] = data.get("total", 0) + len(quotes)